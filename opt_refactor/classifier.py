@@ -2,7 +2,9 @@
 
 from __future__ import annotations
 
+import sys
 from dataclasses import dataclass
+from functools import lru_cache
 from typing import TYPE_CHECKING
 
 if TYPE_CHECKING:
@@ -139,20 +141,72 @@ _RULES: list[tuple[str, set[str] | None, str, str]] = [
     ("public_transport", None, "transport", "other"),
 ]
 
+# Freeze the value sets and intern every string, so that membership tests
+# against interned tag values from the parser hit CPython's identity fast path.
+_FROZEN_RULES: list[tuple[str, frozenset[str] | None, str, str]] = [
+    (
+        sys.intern(key),
+        frozenset(map(sys.intern, values)) if values is not None else None,
+        sys.intern(category),
+        sys.intern(subcategory),
+    )
+    for key, values, category, subcategory in _RULES
+]
+
+# Every category classify() can return, in sorted order
+CATEGORIES: tuple[str, ...] = tuple(sorted({rule[2] for rule in _FROZEN_RULES} | {"other"}))
+
+# Rules grouped by OSM key, each tagged with its position in _FROZEN_RULES.
+# A feature only carries a handful of the keys above, so classification walks
+# just those groups and keeps the lowest-positioned match, which preserves
+# "first match wins" across keys (e.g. landuse=residential beats natural=peak).
+# Results are shared Classification instances (frozen, so safe to reuse).
+_RULES_BY_KEY: dict[str, list[tuple[int, frozenset[str] | None, Classification]]] = {}
+for _priority, (_key, _values, _category, _subcategory) in enumerate(_FROZEN_RULES):
+    _RULES_BY_KEY.setdefault(_key, []).append(
+        (_priority, _values, Classification(_category, _subcategory))
+    )
+del _priority, _key, _values, _category, _subcategory
+
+# Only the values of these keys affect classification; a tuple of them is the
+# cache key ("fingerprint") for _classify_cached.
+_RULE_KEYS: tuple[str, ...] = tuple(sorted(_RULES_BY_KEY))
+_RULE_GROUPS = tuple(_RULES_BY_KEY[key] for key in _RULE_KEYS)
+
 # Default for features that match no rule
 _DEFAULT = Classification("other", "unknown")
 
+# Display label for every subcategory classify() can return,
+# e.g. "power_line" -> "Power Line"
+SUBCATEGORY_LABELS: dict[str, str] = {
+    sub: sub.replace("_", " ").title()
+    for sub in {rule[3] for rule in _FROZEN_RULES} | {_DEFAULT.subcategory}
+}
+
+
+@lru_cache(maxsize=4096)
+def _classify_cached(fingerprint: tuple[str | None, ...]) -> Classification:
+    """Resolve a tag fingerprint (values of ``_RULE_KEYS``, ``None`` if absent)."""
+    best_priority = len(_FROZEN_RULES)
+    best = _DEFAULT
+    for rules, tag_val in zip(_RULE_GROUPS, fingerprint):
+        if tag_val is None:
+            continue
+        for priority, values, result in rules:
+            if priority > best_priority:
+                break
+            if values is None or tag_val in values:
+                best_priority, best = priority, result
+                break
+    return best
+
 
 def classify(feature: Feature) -> Classification:
     """Classify a feature based on its OSM tags.
 
     Returns the first matching Classification, or a default 'other/unknown'.
+    OSM exports repeat the same few tag combinations many times over, so
+    results are cached on the values of the tags the rules look at.
     """
-    tags = feature.tags
-    for key, values, category, subcategory in _RULES:
-        tag_val = tags.get(key)
-        if tag_val is None:
-            continue
-        if values is None or tag_val in values:
-            return Classification(category, subcategory)
-    return _DEFAULT
+    # map() runs the per-key lookups in C, without a generator frame
+    return _classify_cached(tuple(map(feature.tags.get, _RULE_KEYS)))
@@ -8,14 +8,19 @@ Uses lxml directly for full control over the KML structure.
 
 from __future__ import annotations
 
+import os
 import re
-from collections import defaultdict
+import tempfile
+from copy import copy
+from functools import lru_cache
+from typing import IO, Iterator
+from xml.sax.saxutils import escape
 
 from lxml import etree
 
-from .classifier import Classification, classify
+from .classifier import CATEGORIES, SUBCATEGORY_LABELS, Classification, classify
 from .parser import Feature, KML_NS
-from .styles import FeatureStyle, get_style, style_id
+from .styles import FeatureStyle, get_style, kml_hex, style_id
 
 # ---------------------------------------------------------------------------
 # Branding / sanitisation
@@ -39,19 +44,30 @@ ATOC_DESCRIPTION = "Processed by ATOC"
 
 def _sanitise_text(text: str) -> str:
     """Remove Overpass/OSM tool references from a string."""
+    # Every alternative in _OVERPASS_PATTERNS contains one of these literals,
+    # so text without any of them (after casefold, which also folds the few
+    # non-ASCII characters ``re.IGNORECASE`` equates with ASCII letters)
+    # cannot match
+    folded = text.casefold()
+    if not ("overpass" in folded or "osmtogeojson" in folded
+            or "export" in folded or "tokml" in folded):
+        return text.strip()
     return _OVERPASS_PATTERNS.sub("", text).strip()
 
 
+# Internal/metadata tag prefixes left out of description balloons
+_DESCRIPTION_SKIP_PREFIXES = ("@", "id", "source")
+
+
 def _build_description(feature: Feature) -> str:
     """Create a clean HTML description balloon from OSM tags."""
-    skip_prefixes = ("@", "id", "source")
-    rows: list[str] = []
-    for k, v in sorted(feature.tags.items()):
-        if any(k.startswith(p) for p in skip_prefixes):
-            continue
-        rows.append(f"<tr><td><b>{k}</b></td><td>{v}</td></tr>")
-    if not rows:
+    shown = sorted(
+        (k, v) for k, v in feature.tags.items()
+        if not k.startswith(_DESCRIPTION_SKIP_PREFIXES)
+    )
+    if not shown:
         return ""
+    rows = [f"<tr><td><b>{escape(k)}</b></td><td>{escape(v)}</td></tr>" for k, v in shown]
     return "<table>" + "".join(rows) + "</table>"
 
 
@@ -74,11 +90,14 @@ def _coords_text(geom_el: etree._Element) -> str:
 # ---------------------------------------------------------------------------
 
 
+# Standalone elements carry KML as their default namespace so they serialise
+# without prefixes whether appended to a tree or streamed on their own.
+_NSMAP = {None: KML_NS}
+
+
 def _kml_el(tag: str, text: str | None = None, **attribs: str) -> etree._Element:
     """Create a KML-namespaced element."""
-    el = etree.SubElement(etree.Element("dummy"), f"{{{KML_NS}}}{tag}", **attribs)
-    # detach from dummy parent
-    el = etree.Element(f"{{{KML_NS}}}{tag}", **attribs)
+    el = etree.Element(f"{{{KML_NS}}}{tag}", nsmap=_NSMAP, **attribs)
     if text is not None:
         el.text = text
     return el
@@ -94,30 +113,30 @@ def _sub(parent: etree._Element, tag: str, text: str | None = None, **attribs: s
 
 def _build_style_element(sid: str, fstyle: FeatureStyle, geom_type: str) -> etree._Element:
     """Build a <Style id="..."> element."""
-    style = etree.Element(f"{{{KML_NS}}}Style", id=sid)
+    style = etree.Element(f"{{{KML_NS}}}Style", nsmap=_NSMAP, id=sid)
 
     # IconStyle (for points)
-    if geom_type == "Point" and fstyle.icon_href:
+    if geom_type == "Point" and fstyle.icon_index:
         icon_style = _sub(style, "IconStyle")
         _sub(icon_style, "scale", str(fstyle.icon_scale))
-        _sub(icon_style, "color", fstyle.line_color)
+        _sub(icon_style, "color", kml_hex(fstyle.line_color))
         icon = _sub(icon_style, "Icon")
         _sub(icon, "href", fstyle.icon_href)
 
     # LabelStyle
     label_style = _sub(style, "LabelStyle")
-    _sub(label_style, "color", fstyle.label_color)
+    _sub(label_style, "color", kml_hex(fstyle.label_color))
     _sub(label_style, "scale", str(fstyle.label_scale))
 
     # LineStyle
     line_style = _sub(style, "LineStyle")
-    _sub(line_style, "color", fstyle.line_color)
+    _sub(line_style, "color", kml_hex(fstyle.line_color))
     _sub(line_style, "width", str(fstyle.line_width))
 
     # PolyStyle (for polygons)
     if geom_type == "Polygon" and fstyle.poly_color:
         poly_style = _sub(style, "PolyStyle")
-        _sub(poly_style, "color", fstyle.poly_color)
+        _sub(poly_style, "color", kml_hex(fstyle.poly_color))
         _sub(poly_style, "fill", "1" if fstyle.poly_fill else "0")
         _sub(poly_style, "outline", "1" if fstyle.poly_outline else "0")
 
@@ -125,9 +144,28 @@ def _build_style_element(sid: str, fstyle: FeatureStyle, geom_type: str) -> etre
 
 
 def _copy_geometry(geom_el: etree._Element) -> etree._Element:
-    """Deep-copy a geometry element, preserving its structure."""
-    from copy import deepcopy
-    return deepcopy(geom_el)
+    """Deep-copy a geometry element, preserving its structure.
+
+    lxml's ``__copy__`` already clones the whole subtree in C; going through
+    ``copy.copy`` rather than ``deepcopy`` skips the unused memo bookkeeping.
+    The geometry is copied rather than moved so features stay reusable.
+    """
+    return copy(geom_el)
+
+
+@lru_cache(maxsize=256)
+def _placemark_template(sid: str) -> etree._Element:
+    """Return the shared <Placemark> skeleton for a style id.
+
+    Holds empty <name> and <description> children followed by the style's
+    <styleUrl>; placemarks are cloned from it in C rather than assembled
+    element by element.
+    """
+    pm = etree.Element(f"{{{KML_NS}}}Placemark", nsmap=_NSMAP)
+    _sub(pm, "name")
+    _sub(pm, "description")
+    _sub(pm, "styleUrl", f"#{sid}")
+    return pm
 
 
 def _build_placemark(
@@ -137,16 +175,18 @@ def _build_placemark(
     sid: str,
 ) -> etree._Element:
     """Build a styled <Placemark> element."""
-    pm = etree.Element(f"{{{KML_NS}}}Placemark")
+    pm = copy(_placemark_template(sid))
+    name_el, desc_el = pm[0], pm[1]
 
-    name = _sanitise_text(feature.name) or cls.subcategory.replace("_", " ").title()
-    _sub(pm, "name", name)
+    name_el.text = _sanitise_text(feature.name) or SUBCATEGORY_LABELS[cls.subcategory]
 
     desc = _build_description(feature)
     if desc:
-        _sub(pm, "description", desc)
-
-    _sub(pm, "styleUrl", f"#{sid}")
+        # CDATA keeps the HTML verbatim instead of entity-escaping every tag.
+        # _build_description escapes tag text, so "]]>" cannot occur in it.
+        desc_el.text = etree.CDATA(desc)
+    else:
+        pm.remove(desc_el)
 
     # Copy original geometry
     geom_copy = _copy_geometry(feature.geometry_element)
@@ -155,17 +195,133 @@ def _build_placemark(
     return pm
 
 
+# ---------------------------------------------------------------------------
+# Document assembly
+# ---------------------------------------------------------------------------
+
+_FOLDER_LABELS = {
+    "road": "Roads", "railway": "Railways", "water": "Water",
+    "building": "Buildings", "green": "Green Spaces", "sport": "Sports",
+    "landuse": "Land Use", "amenity": "Amenities", "tourism": "Tourism",
+    "shop": "Shops", "utility": "Utilities", "barrier": "Barriers",
+    "aeroway": "Aeroways", "natural": "Natural Features",
+    "boundary": "Boundaries", "transport": "Public Transport",
+    "other": "Other",
+}
+
+# Folder position of each category, so features bucket by list index
+_CAT_IDX = {category: i for i, category in enumerate(CATEGORIES)}
+
+# A feature with its classification, style id and resolved style
+_StyledFeature = tuple[Feature, Classification, str, FeatureStyle]
+
+
+def _classify_feature(
+    feat: Feature,
+    styles_needed: dict[str, tuple[FeatureStyle, str]],
+) -> tuple[Classification, str, FeatureStyle]:
+    """Classify one feature and resolve its style id and style.
+
+    Records the style in ``styles_needed`` (style id -> ``(style, geom_type)``)
+    the first time its id is seen, so the first geometry type wins.
+    """
+    cls = classify(feat)
+    sid = style_id(cls.category, cls.subcategory)
+    fstyle = get_style(cls.category, cls.subcategory)
+    if sid not in styles_needed:
+        styles_needed[sid] = (fstyle, feat.geometry_type)
+    return cls, sid, fstyle
+
+
+def _classify_features(
+    features: list[Feature],
+) -> tuple[dict[str, tuple[FeatureStyle, str]], list[tuple[str, list[_StyledFeature]]]]:
+    """Classify features and resolve their styles, collecting the shared styles.
+
+    Used by the streaming writer, which must emit every <Style> before the
+    first placemark and so cannot build placemarks during classification.
+
+    Returns:
+        ``(styles_needed, grouped)`` where ``styles_needed`` maps style id to
+        ``(style, geom_type)`` (the first geometry type seen wins) and
+        ``grouped`` lists ``(category, items)`` in category order, skipping
+        empty categories, with ``(feature, classification, style id, style)``
+        tuples as items.
+    """
+    styles_needed: dict[str, tuple[FeatureStyle, str]] = {}
+    buckets: list[list[_StyledFeature]] = [[] for _ in CATEGORIES]
+
+    for feat in features:
+        cls, sid, fstyle = _classify_feature(feat, styles_needed)
+        buckets[_CAT_IDX[cls.category]].append((feat, cls, sid, fstyle))
+
+    grouped = [(category, items) for category, items in zip(CATEGORIES, buckets) if items]
+    return styles_needed, grouped
+
+
+def _document_header(document_name: str) -> list[etree._Element]:
+    """Build the <name>/<description> elements opening the Document."""
+    return [
+        _kml_el("name", _sanitise_text(document_name) or "ATOC Export"),
+        _kml_el("description", ATOC_DESCRIPTION),
+    ]
+
+
+def _folder_name(category: str) -> etree._Element:
+    return _kml_el("name", _FOLDER_LABELS.get(category, category.title()))
+
+
+def _build_placemarks(items: list[_StyledFeature]) -> Iterator[etree._Element]:
+    """Yield a styled <Placemark> for each classified feature."""
+    for feat, cls, sid, fstyle in items:
+        yield _build_placemark(feat, cls, fstyle, sid)
+
+
+def _write_document(
+    out: IO[bytes],
+    styles_needed: dict[str, tuple[FeatureStyle, str]],
+    grouped: list[tuple[str, list[_StyledFeature]]],
+    use_folders: bool,
+    document_name: str,
+) -> None:
+    """Stream a classified document to ``out`` one element at a time."""
+    with etree.xmlfile(out, encoding="UTF-8") as xf:
+        xf.write_declaration()
+        with xf.element(f"{{{KML_NS}}}kml", nsmap=_NSMAP):
+            xf.write("\n")
+            with xf.element(f"{{{KML_NS}}}Document"):
+                xf.write("\n")
+                for el in _document_header(document_name):
+                    xf.write(el, pretty_print=True)
+
+                for sid, (fstyle, geom_type) in sorted(styles_needed.items()):
+                    xf.write(_build_style_element(sid, fstyle, geom_type), pretty_print=True)
+
+                for category, items in grouped:
+                    if use_folders:
+                        with xf.element(f"{{{KML_NS}}}Folder"):
+                            xf.write("\n")
+                            xf.write(_folder_name(category), pretty_print=True)
+                            for pm in _build_placemarks(items):
+                                xf.write(pm, pretty_print=True)
+                        xf.write("\n")
+                    else:
+                        for pm in _build_placemarks(items):
+                            xf.write(pm, pretty_print=True)
+            xf.write("\n")
+
+
 # ---------------------------------------------------------------------------
 # Public API
 # ---------------------------------------------------------------------------
 
 
-def generate_styled_kml(
+def generate_styled_kml_bytes(
     features: list[Feature],
     *,
     use_folders: bool = True,
     document_name: str = "ATOC Export",
-) -> str:
+) -> bytes:
     """Transform parsed features into a fully styled KML document.
 
     Args:
@@ -174,25 +330,20 @@ def generate_styled_kml(
         document_name: Name for the KML Document element.
 
     Returns:
-        KML content as a UTF-8 string.
+        KML content as UTF-8 encoded bytes.
     """
-    nsmap = {None: KML_NS}
-    kml_root = etree.Element(f"{{{KML_NS}}}kml", nsmap=nsmap)
+    kml_root = etree.Element(f"{{{KML_NS}}}kml", nsmap=_NSMAP)
     doc = _sub(kml_root, "Document")
-    _sub(doc, "name", _sanitise_text(document_name) or "ATOC Export")
-    _sub(doc, "description", ATOC_DESCRIPTION)
+    doc.extend(_document_header(document_name))
 
-    # Classify all features and collect unique styles needed
-    classified: list[tuple[Feature, Classification]] = []
+    # Single pass: classify each feature, note the style it needs and build
+    # its placemark straight into its category's bucket
     styles_needed: dict[str, tuple[FeatureStyle, str]] = {}  # sid -> (style, geom_type)
+    buckets: list[list[etree._Element]] = [[] for _ in CATEGORIES]
 
     for feat in features:
-        cls = classify(feat)
-        classified.append((feat, cls))
-        sid = style_id(cls.category, cls.subcategory)
-        if sid not in styles_needed:
-            fstyle = get_style(cls.category, cls.subcategory)
-            styles_needed[sid] = (fstyle, feat.geometry_type)
+        cls, sid, fstyle = _classify_feature(feat, styles_needed)
+        buckets[_CAT_IDX[cls.category]].append(_build_placemark(feat, cls, fstyle, sid))
 
     # Emit shared styles at document level
     for sid, (fstyle, geom_type) in sorted(styles_needed.items()):
@@ -203,34 +354,17 @@ def generate_styled_kml(
     # (e.g., a style defined for Points but first seen as LineString)
     # We handle this by emitting one style per sid; the first geometry type wins.
 
-    # Group features by category
-    grouped: dict[str, list[tuple[Feature, Classification]]] = defaultdict(list)
-    for feat, cls in classified:
-        grouped[cls.category].append((feat, cls))
-
-    folder_labels = {
-        "road": "Roads", "railway": "Railways", "water": "Water",
-        "building": "Buildings", "green": "Green Spaces", "sport": "Sports",
-        "landuse": "Land Use", "amenity": "Amenities", "tourism": "Tourism",
-        "shop": "Shops", "utility": "Utilities", "barrier": "Barriers",
-        "aeroway": "Aeroways", "natural": "Natural Features",
-        "boundary": "Boundaries", "transport": "Public Transport",
-        "other": "Other",
-    }
-
-    for category, items in sorted(grouped.items()):
+    for category, placemarks in zip(CATEGORIES, buckets):
+        if not placemarks:
+            continue
         if use_folders:
             folder = _sub(doc, "Folder")
-            _sub(folder, "name", folder_labels.get(category, category.title()))
+            folder.append(_folder_name(category))
             parent = folder
         else:
             parent = doc
 
-        for feat, cls in items:
-            sid = style_id(cls.category, cls.subcategory)
-            fstyle = get_style(cls.category, cls.subcategory)
-            pm = _build_placemark(feat, cls, fstyle, sid)
-            parent.append(pm)
+        parent.extend(placemarks)
 
     tree = etree.ElementTree(kml_root)
     return etree.tostring(
@@ -238,15 +372,66 @@ def generate_styled_kml(
         xml_declaration=True,
         encoding="UTF-8",
         pretty_print=True,
+    )
+
+
+def generate_styled_kml(
+    features: list[Feature],
+    *,
+    use_folders: bool = True,
+    document_name: str = "ATOC Export",
+) -> str:
+    """Like :func:`generate_styled_kml_bytes`, but return the KML as a string.
+
+    Prefer the bytes variant (or :func:`generate_styled_kml_file`) when the
+    result is headed for disk or the network; decoding here only to encode
+    again later touches the whole document twice.
+    """
+    return generate_styled_kml_bytes(
+        features,
+        use_folders=use_folders,
+        document_name=document_name,
     ).decode("utf-8")
 
 
 def generate_styled_kml_file(
     features: list[Feature],
     output_path: str,
-    **kwargs,
+    *,
+    use_folders: bool = True,
+    document_name: str = "ATOC Export",
 ) -> None:
-    """Generate styled KML and write to a file."""
-    content = generate_styled_kml(features, **kwargs)
-    with open(output_path, "w", encoding="utf-8") as f:
-        f.write(content)
+    """Generate styled KML and write it to a file.
+
+    Streams the document to disk one element at a time, so each <Placemark>
+    is discarded once it has been written instead of the whole output tree
+    being held in memory.  The document is written to a temporary file that
+    replaces ``output_path`` only on success, so a failed run leaves any
+    existing file there as it was.
+
+    The result is namespace-equivalent to :func:`generate_styled_kml`, not
+    byte-identical: every Document/Folder-level <name>, <description>,
+    <Style> and <Placemark> carries its own
+    ``xmlns="http://www.opengis.net/kml/2.2"``, and the children of
+    <Document> and <Folder> are not indented.  Parsed back, both outputs
+    give the same elements, attributes, text and namespaces.
+    """
+    styles_needed, grouped = _classify_features(features)
+
+    # Stream into a temporary file beside the target and move it into place
+    # only once the document is complete, so a failure part-way through
+    # leaves any existing file at output_path untouched
+    directory = os.path.dirname(os.path.abspath(output_path))
+    tmp = tempfile.NamedTemporaryFile(dir=directory, suffix=".tmp", delete=False)
+    try:
+        with tmp:
+            _write_document(tmp, styles_needed, grouped, use_folders, document_name)
+        # NamedTemporaryFile creates the file 0600; give it the permissions
+        # open() would have
+        umask = os.umask(0)
+        os.umask(umask)
+        os.chmod(tmp.name, 0o666 & ~umask)
+        os.replace(tmp.name, output_path)
+    except BaseException:
+        os.unlink(tmp.name)
+        raise
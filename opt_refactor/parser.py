@@ -2,10 +2,15 @@
 
 from __future__ import annotations
 
+import sys
 from dataclasses import dataclass, field
-from typing import Literal
+from io import BytesIO
+from typing import IO, Literal
+
 from lxml import etree
 
+from .classifier import _RULE_KEYS
+
 # KML namespace
 KML_NS = "http://www.opengis.net/kml/2.2"
 NS = {"kml": KML_NS}
@@ -14,6 +19,19 @@ GeometryType = Literal["Point", "LineString", "Polygon", "MultiGeometry"]
 
 GEOMETRY_TAGS = {"Point", "LineString", "Polygon", "MultiGeometry"}
 
+# Namespaced geometry tag -> geometry type, for matching placemark children
+_GEOMETRY_QNAMES: dict[str, GeometryType] = {
+    f"{{{KML_NS}}}{tag}": tag for tag in GEOMETRY_TAGS  # type: ignore[misc]
+}
+
+# Namespaced tags of the <ExtendedData><Data><value> structure holding OSM tags
+_EXTENDED_DATA = f"{{{KML_NS}}}ExtendedData"
+_DATA = f"{{{KML_NS}}}Data"
+_VALUE = f"{{{KML_NS}}}value"
+
+# Keys whose values the classifier compares; only these values are interned
+_CLASSIFIED_KEYS = frozenset(_RULE_KEYS)
+
 
 @dataclass
 class Feature:
@@ -30,25 +48,98 @@ class Feature:
 
 
 def _extract_tags(placemark: etree._Element) -> dict[str, str]:
-    """Pull OSM tags from <ExtendedData><Data name="..."><value>...</value>."""
+    """Pull OSM tags from <ExtendedData><Data name="..."><value>...</value>.
+
+    Keys, and the values of keys the classifier looks at (``highway``,
+    ``residential``, ...), are interned: they repeat across nearly every
+    feature and match the classifier's interned rule strings by identity.
+    Other values (ids, names, addresses) are mostly unique and left alone.
+    """
     tags: dict[str, str] = {}
-    for data_el in placemark.findall(".//kml:ExtendedData/kml:Data", NS):
+    extended = placemark.find(_EXTENDED_DATA)
+    if extended is None:
+        return tags
+    for data_el in extended:
+        if data_el.tag != _DATA:
+            continue
         key = data_el.get("name", "")
-        value_el = data_el.find("kml:value", NS)
+        value_el = data_el.find(_VALUE)
         if key and value_el is not None and value_el.text:
-            tags[key] = value_el.text
+            key = sys.intern(key)
+            value = value_el.text
+            if key in _CLASSIFIED_KEYS:
+                value = sys.intern(value)
+            tags[key] = value
     return tags
 
 
 def _detect_geometry(placemark: etree._Element) -> tuple[GeometryType, etree._Element] | None:
     """Find the first geometry element inside a placemark."""
-    for tag in GEOMETRY_TAGS:
-        el = placemark.find(f"kml:{tag}", NS)
-        if el is not None:
-            return tag, el  # type: ignore[return-value]
+    for child in placemark:
+        geom_type = _GEOMETRY_QNAMES.get(child.tag)
+        if geom_type is not None:
+            return geom_type, child
     return None
 
 
+def _feature_from_placemark(pm: etree._Element) -> Feature | None:
+    """Build a Feature from a <Placemark>, or None if it has no geometry.
+
+    The geometry element is detached from the placemark so that it outlives
+    the placemark being cleared by the streaming parser.
+    """
+    geom = _detect_geometry(pm)
+    if geom is None:
+        return None
+
+    geom_type, geom_el = geom
+    tags = _extract_tags(pm)
+
+    name_el = pm.find("kml:name", NS)
+    name = name_el.text.strip() if name_el is not None and name_el.text else ""
+
+    osm_id = tags.get("@id", tags.get("id", ""))
+
+    pm.remove(geom_el)
+    return Feature(
+        name=name,
+        geometry_type=geom_type,
+        geometry_element=geom_el,
+        tags=tags,
+        osm_id=osm_id,
+    )
+
+
+def _parse_stream(source: IO[bytes]) -> list[Feature]:
+    """Stream <Placemark> elements out of a KML byte stream.
+
+    Each placemark is dropped from the partially built tree once it has been
+    turned into a Feature, so peak memory is bounded by the features rather
+    than by the whole document.
+    """
+    features: list[Feature] = []
+
+    for _, pm in etree.iterparse(
+        source,
+        events=("end",),
+        tag=f"{{{KML_NS}}}Placemark",
+        huge_tree=True,
+        collect_ids=False,
+    ):
+        feature = _feature_from_placemark(pm)
+        if feature is not None:
+            features.append(feature)
+
+        # Free this placemark and everything before it at the same level
+        pm.clear()
+        parent = pm.getparent()
+        if parent is not None:
+            while pm.getprevious() is not None:
+                del parent[0]
+
+    return features
+
+
 def parse_kml(source: str | bytes) -> list[Feature]:
     """Parse a KML string/bytes and return a list of Features.
 
@@ -61,34 +152,10 @@ def parse_kml(source: str | bytes) -> list[Feature]:
     if isinstance(source, str):
         source = source.encode("utf-8")
 
-    tree = etree.fromstring(source)
-    features: list[Feature] = []
-
-    for pm in tree.iter(f"{{{KML_NS}}}Placemark"):
-        geom = _detect_geometry(pm)
-        if geom is None:
-            continue
-
-        geom_type, geom_el = geom
-        tags = _extract_tags(pm)
-
-        name_el = pm.find("kml:name", NS)
-        name = name_el.text.strip() if name_el is not None and name_el.text else ""
-
-        osm_id = tags.get("@id", tags.get("id", ""))
-
-        features.append(Feature(
-            name=name,
-            geometry_type=geom_type,
-            geometry_element=geom_el,
-            tags=tags,
-            osm_id=osm_id,
-        ))
-
-    return features
+    return _parse_stream(BytesIO(source))
 
 
 def parse_kml_file(path: str) -> list[Feature]:
-    """Convenience wrapper: read a KML file from disk and parse it."""
+    """Read a KML file from disk and parse it, streaming its placemarks."""
     with open(path, "rb") as f:
-        return parse_kml(f.read())
+        return _parse_stream(f)
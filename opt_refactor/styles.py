@@ -1,19 +1,41 @@
 """KML style definitions mapped to feature classifications.
 
-KML colors use the format ``aabbggrr`` (alpha-blue-green-red).
-Helper utilities convert from standard hex RGB for readability.
+KML colors use the format ``aabbggrr`` (alpha-blue-green-red).  Styles hold
+them as packed ``0xaabbggrr`` integers; helper utilities convert from standard
+hex RGB for readability and to KML hex text for output.
 """
 
 from __future__ import annotations
 
+import re
+import sys
 from dataclasses import dataclass
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Any, Callable, Iterable, Mapping
 
 
-def rgb_to_kml(hex_rgb: str, alpha: str = "ff") -> str:
-    """Convert ``#RRGGBB`` or ``RRGGBB`` to KML ``aabbggrr``."""
-    h = hex_rgb.lstrip("#")
-    r, g, b = h[0:2], h[2:4], h[4:6]
-    return f"{alpha}{b}{g}{r}"
+# Exactly six hex digits; int(..., 16) alone would also take signs, "0x",
+# whitespace and underscores
+_HEX_RGB = re.compile(r"[0-9A-Fa-f]{6}")
+
+
+@lru_cache(maxsize=512)
+def rgb_to_kml(hex_rgb: str, alpha: int = 0xff) -> int:
+    """Convert ``#RRGGBB`` or ``RRGGBB`` to a packed KML ``0xaabbggrr`` color."""
+    h = hex_rgb[1:] if hex_rgb[:1] == "#" else hex_rgb
+    if _HEX_RGB.fullmatch(h) is None:
+        raise ValueError(f"expected #RRGGBB or RRGGBB, got {hex_rgb!r}")
+    if not 0 <= alpha <= 0xff:
+        raise ValueError(f"alpha must be in 0..0xff, got {alpha!r}")
+    n = int(h, 16)
+    r, g, b = (n >> 16) & 0xff, (n >> 8) & 0xff, n & 0xff
+    return (alpha << 24) | (b << 16) | (g << 8) | r
+
+
+def kml_hex(color: int) -> str:
+    """Format a packed KML color as the ``aabbggrr`` text KML expects."""
+    return f"{color:08x}"
 
 
 # ---------------------------------------------------------------------------
@@ -21,27 +43,32 @@ def rgb_to_kml(hex_rgb: str, alpha: str = "ff") -> str:
 # ---------------------------------------------------------------------------
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class FeatureStyle:
     """Visual style to apply to a KML feature."""
 
     # Line / polygon outline
-    line_color: str       # KML aabbggrr
+    line_color: int       # KML 0xaabbggrr
     line_width: float = 2.0
 
     # Polygon fill (only used for Polygon geometries)
-    poly_color: str = ""  # KML aabbggrr; empty = no fill
+    poly_color: int = 0   # KML 0xaabbggrr; 0 = no fill
     poly_fill: bool = True
     poly_outline: bool = True
 
     # Point icon
-    icon_href: str = ""   # URL; empty = default pushpin
+    icon_index: int = 0   # index into _ICONS; 0 = default pushpin
     icon_scale: float = 1.0
 
     # Label
-    label_color: str = "ffffffff"
+    label_color: int = 0xffffffff
     label_scale: float = 0.8
 
+    @property
+    def icon_href(self) -> str:
+        """Icon URL; empty = default pushpin."""
+        return _ICONS[self.icon_index]
+
 
 # ---------------------------------------------------------------------------
 # Google Earth built-in icon base URL
@@ -71,189 +98,214 @@ ICON_RAIL_STATION = f"{_GICON}/shapes/rail.png"
 ICON_BUS = f"{_GICON}/shapes/bus.png"
 ICON_DEFAULT = f"{_GICON}/paddle/wht-circle.png"
 
+# Each icon URL stored once; styles refer to them by index (0 = no icon)
+_ICONS: tuple[str, ...] = (
+    "",
+    ICON_CIRCLE, ICON_SQUARE, ICON_STAR, ICON_TRIANGLE, ICON_DINING,
+    ICON_SCHOOLS, ICON_HOSPITAL, ICON_PARKING, ICON_POLICE, ICON_WORSHIP,
+    ICON_HOTEL, ICON_MUSEUM, ICON_VIEWPOINT, ICON_CAMPING, ICON_SHOP,
+    ICON_TREE, ICON_PEAK, ICON_RAIL_STATION, ICON_BUS, ICON_DEFAULT,
+)
+_ICON_IDX = {href: i for i, href in enumerate(_ICONS)}
+
 # ---------------------------------------------------------------------------
 # Style palette — keyed by (category, subcategory)
 #
 # Falls back: (category, subcategory) -> (category, "*") -> ("other", "*")
 # ---------------------------------------------------------------------------
 
-_STYLES: dict[tuple[str, str], FeatureStyle] = {
+# One row per style:
+#   (category, subcategory, line RGB, line width, fill RGB, fill alpha, icon, icon scale)
+# Fill and icon are None when the style has none.
+_PALETTE: list[tuple[str, str, str, float, str | None, int | None, str | None, float]] = [
     # ---- Roads ----
-    ("road", "motorway"):    FeatureStyle(line_color=rgb_to_kml("#E74C3C"), line_width=5.0),
-    ("road", "trunk"):       FeatureStyle(line_color=rgb_to_kml("#E67E22"), line_width=4.5),
-    ("road", "primary"):     FeatureStyle(line_color=rgb_to_kml("#F39C12"), line_width=4.0),
-    ("road", "secondary"):   FeatureStyle(line_color=rgb_to_kml("#F1C40F"), line_width=3.5),
-    ("road", "tertiary"):    FeatureStyle(line_color=rgb_to_kml("#FFFFFF"), line_width=3.0),
-    ("road", "residential"): FeatureStyle(line_color=rgb_to_kml("#BDC3C7"), line_width=2.5),
-    ("road", "service"):     FeatureStyle(line_color=rgb_to_kml("#95A5A6"), line_width=2.0),
-    ("road", "unclassified"):FeatureStyle(line_color=rgb_to_kml("#BDC3C7"), line_width=2.0),
-    ("road", "footway"):     FeatureStyle(line_color=rgb_to_kml("#E88DB4"), line_width=1.5),
-    ("road", "cycleway"):    FeatureStyle(line_color=rgb_to_kml("#2980B9"), line_width=2.0),
-    ("road", "track"):       FeatureStyle(line_color=rgb_to_kml("#8B6914"), line_width=1.5),
-    ("road", "*"):           FeatureStyle(line_color=rgb_to_kml("#CCCCCC"), line_width=2.0),
+    ("road",      "motorway",       "#E74C3C", 5.0, None,      None, None,              1.0),
+    ("road",      "trunk",          "#E67E22", 4.5, None,      None, None,              1.0),
+    ("road",      "primary",        "#F39C12", 4.0, None,      None, None,              1.0),
+    ("road",      "secondary",      "#F1C40F", 3.5, None,      None, None,              1.0),
+    ("road",      "tertiary",       "#FFFFFF", 3.0, None,      None, None,              1.0),
+    ("road",      "residential",    "#BDC3C7", 2.5, None,      None, None,              1.0),
+    ("road",      "service",        "#95A5A6", 2.0, None,      None, None,              1.0),
+    ("road",      "unclassified",   "#BDC3C7", 2.0, None,      None, None,              1.0),
+    ("road",      "footway",        "#E88DB4", 1.5, None,      None, None,              1.0),
+    ("road",      "cycleway",       "#2980B9", 2.0, None,      None, None,              1.0),
+    ("road",      "track",          "#8B6914", 1.5, None,      None, None,              1.0),
+    ("road",      "*",              "#CCCCCC", 2.0, None,      None, None,              1.0),
 
     # ---- Railways ----
-    ("railway", "rail"):     FeatureStyle(line_color=rgb_to_kml("#2C3E50"), line_width=3.0, icon_href=ICON_RAIL_STATION),
-    ("railway", "subway"):   FeatureStyle(line_color=rgb_to_kml("#8E44AD"), line_width=3.0, icon_href=ICON_RAIL_STATION),
-    ("railway", "tram"):     FeatureStyle(line_color=rgb_to_kml("#C0392B"), line_width=2.0, icon_href=ICON_RAIL_STATION),
-    ("railway", "station"):  FeatureStyle(line_color=rgb_to_kml("#2C3E50"), line_width=2.0, icon_href=ICON_RAIL_STATION, icon_scale=1.2),
-    ("railway", "*"):        FeatureStyle(line_color=rgb_to_kml("#2C3E50"), line_width=2.0, icon_href=ICON_RAIL_STATION),
+    ("railway",   "rail",           "#2C3E50", 3.0, None,      None, ICON_RAIL_STATION, 1.0),
+    ("railway",   "subway",         "#8E44AD", 3.0, None,      None, ICON_RAIL_STATION, 1.0),
+    ("railway",   "tram",           "#C0392B", 2.0, None,      None, ICON_RAIL_STATION, 1.0),
+    ("railway",   "station",        "#2C3E50", 2.0, None,      None, ICON_RAIL_STATION, 1.2),
+    ("railway",   "*",              "#2C3E50", 2.0, None,      None, ICON_RAIL_STATION, 1.0),
 
     # ---- Water ----
-    ("water", "river"):  FeatureStyle(line_color=rgb_to_kml("#2980B9"), line_width=3.5,
-                                      poly_color=rgb_to_kml("#3498DB", "80")),
-    ("water", "stream"): FeatureStyle(line_color=rgb_to_kml("#5DADE2"), line_width=2.0),
-    ("water", "lake"):   FeatureStyle(line_color=rgb_to_kml("#2471A3"), line_width=2.0,
-                                      poly_color=rgb_to_kml("#3498DB", "80")),
-    ("water", "*"):      FeatureStyle(line_color=rgb_to_kml("#2980B9"), line_width=2.0,
-                                      poly_color=rgb_to_kml("#3498DB", "80")),
+    ("water",     "river",          "#2980B9", 3.5, "#3498DB", 0x80, None,              1.0),
+    ("water",     "stream",         "#5DADE2", 2.0, None,      None, None,              1.0),
+    ("water",     "lake",           "#2471A3", 2.0, "#3498DB", 0x80, None,              1.0),
+    ("water",     "*",              "#2980B9", 2.0, "#3498DB", 0x80, None,              1.0),
 
     # ---- Buildings ----
-    ("building", "worship"):    FeatureStyle(line_color=rgb_to_kml("#8E44AD"), line_width=1.5,
-                                             poly_color=rgb_to_kml("#D2B4DE", "90"), icon_href=ICON_WORSHIP),
-    ("building", "education"):  FeatureStyle(line_color=rgb_to_kml("#27AE60"), line_width=1.5,
-                                             poly_color=rgb_to_kml("#A9DFBF", "90"), icon_href=ICON_SCHOOLS),
-    ("building", "hospital"):   FeatureStyle(line_color=rgb_to_kml("#E74C3C"), line_width=1.5,
-                                             poly_color=rgb_to_kml("#F5B7B1", "90"), icon_href=ICON_HOSPITAL),
-    ("building", "commercial"):FeatureStyle(line_color=rgb_to_kml("#2980B9"), line_width=1.5,
-                                             poly_color=rgb_to_kml("#AED6F1", "90")),
-    ("building", "industrial"):FeatureStyle(line_color=rgb_to_kml("#7F8C8D"), line_width=1.5,
-                                             poly_color=rgb_to_kml("#D5D8DC", "90")),
-    ("building", "*"):         FeatureStyle(line_color=rgb_to_kml("#B0703C"), line_width=1.0,
-                                             poly_color=rgb_to_kml("#E8C9A0", "90")),
+    ("building",  "worship",        "#8E44AD", 1.5, "#D2B4DE", 0x90, ICON_WORSHIP,      1.0),
+    ("building",  "education",      "#27AE60", 1.5, "#A9DFBF", 0x90, ICON_SCHOOLS,      1.0),
+    ("building",  "hospital",       "#E74C3C", 1.5, "#F5B7B1", 0x90, ICON_HOSPITAL,     1.0),
+    ("building",  "commercial",     "#2980B9", 1.5, "#AED6F1", 0x90, None,              1.0),
+    ("building",  "industrial",     "#7F8C8D", 1.5, "#D5D8DC", 0x90, None,              1.0),
+    ("building",  "*",              "#B0703C", 1.0, "#E8C9A0", 0x90, None,              1.0),
 
     # ---- Green spaces ----
-    ("green", "park"):           FeatureStyle(line_color=rgb_to_kml("#27AE60"), line_width=2.0,
-                                              poly_color=rgb_to_kml("#2ECC71", "70"), icon_href=ICON_TREE),
-    ("green", "forest"):         FeatureStyle(line_color=rgb_to_kml("#1E8449"), line_width=2.0,
-                                              poly_color=rgb_to_kml("#196F3D", "70")),
-    ("green", "nature_reserve"): FeatureStyle(line_color=rgb_to_kml("#1ABC9C"), line_width=2.5,
-                                              poly_color=rgb_to_kml("#A3E4D7", "60")),
-    ("green", "grass"):          FeatureStyle(line_color=rgb_to_kml("#82E0AA"), line_width=1.5,
-                                              poly_color=rgb_to_kml("#ABEBC6", "70")),
-    ("green", "protected"):      FeatureStyle(line_color=rgb_to_kml("#1ABC9C"), line_width=3.0,
-                                              poly_color=rgb_to_kml("#A3E4D7", "50")),
-    ("green", "*"):              FeatureStyle(line_color=rgb_to_kml("#27AE60"), line_width=1.5,
-                                              poly_color=rgb_to_kml("#2ECC71", "60")),
+    ("green",     "park",           "#27AE60", 2.0, "#2ECC71", 0x70, ICON_TREE,         1.0),
+    ("green",     "forest",         "#1E8449", 2.0, "#196F3D", 0x70, None,              1.0),
+    ("green",     "nature_reserve", "#1ABC9C", 2.5, "#A3E4D7", 0x60, None,              1.0),
+    ("green",     "grass",          "#82E0AA", 1.5, "#ABEBC6", 0x70, None,              1.0),
+    ("green",     "protected",      "#1ABC9C", 3.0, "#A3E4D7", 0x50, None,              1.0),
+    ("green",     "*",              "#27AE60", 1.5, "#2ECC71", 0x60, None,              1.0),
 
     # ---- Sport ----
-    ("sport", "*"): FeatureStyle(line_color=rgb_to_kml("#F39C12"), line_width=2.0,
-                                 poly_color=rgb_to_kml("#F9E79F", "70")),
+    ("sport",     "*",              "#F39C12", 2.0, "#F9E79F", 0x70, None,              1.0),
 
     # ---- Land use ----
-    ("landuse", "residential"): FeatureStyle(line_color=rgb_to_kml("#D5D8DC"), line_width=1.0,
-                                             poly_color=rgb_to_kml("#EAECEE", "50")),
-    ("landuse", "commercial"):  FeatureStyle(line_color=rgb_to_kml("#AED6F1"), line_width=1.0,
-                                             poly_color=rgb_to_kml("#D6EAF8", "50")),
-    ("landuse", "industrial"):  FeatureStyle(line_color=rgb_to_kml("#ABB2B9"), line_width=1.0,
-                                             poly_color=rgb_to_kml("#D5D8DC", "50")),
-    ("landuse", "farmland"):    FeatureStyle(line_color=rgb_to_kml("#F5CBA7"), line_width=1.0,
-                                             poly_color=rgb_to_kml("#FDEBD0", "50")),
-    ("landuse", "cemetery"):    FeatureStyle(line_color=rgb_to_kml("#7D8B8A"), line_width=1.5,
-                                             poly_color=rgb_to_kml("#ABB2B9", "60")),
-    ("landuse", "military"):    FeatureStyle(line_color=rgb_to_kml("#E74C3C"), line_width=2.5,
-                                             poly_color=rgb_to_kml("#F5B7B1", "40")),
-    ("landuse", "*"):           FeatureStyle(line_color=rgb_to_kml("#D5D8DC"), line_width=1.0,
-                                             poly_color=rgb_to_kml("#EAECEE", "40")),
+    ("landuse",   "residential",    "#D5D8DC", 1.0, "#EAECEE", 0x50, None,              1.0),
+    ("landuse",   "commercial",     "#AED6F1", 1.0, "#D6EAF8", 0x50, None,              1.0),
+    ("landuse",   "industrial",     "#ABB2B9", 1.0, "#D5D8DC", 0x50, None,              1.0),
+    ("landuse",   "farmland",       "#F5CBA7", 1.0, "#FDEBD0", 0x50, None,              1.0),
+    ("landuse",   "cemetery",       "#7D8B8A", 1.5, "#ABB2B9", 0x60, None,              1.0),
+    ("landuse",   "military",       "#E74C3C", 2.5, "#F5B7B1", 0x40, None,              1.0),
+    ("landuse",   "*",              "#D5D8DC", 1.0, "#EAECEE", 0x40, None,              1.0),
 
     # ---- Amenities ----
-    ("amenity", "food"):      FeatureStyle(line_color=rgb_to_kml("#E67E22"), line_width=1.5,
-                                           icon_href=ICON_DINING, icon_scale=1.1),
-    ("amenity", "education"): FeatureStyle(line_color=rgb_to_kml("#27AE60"), line_width=1.5,
-                                           icon_href=ICON_SCHOOLS, icon_scale=1.1),
-    ("amenity", "health"):    FeatureStyle(line_color=rgb_to_kml("#E74C3C"), line_width=1.5,
-                                           icon_href=ICON_HOSPITAL, icon_scale=1.1),
-    ("amenity", "transport"): FeatureStyle(line_color=rgb_to_kml("#3498DB"), line_width=1.5,
-                                           icon_href=ICON_PARKING, icon_scale=1.0),
-    ("amenity", "emergency"): FeatureStyle(line_color=rgb_to_kml("#2980B9"), line_width=1.5,
-                                           icon_href=ICON_POLICE, icon_scale=1.1),
-    ("amenity", "worship"):   FeatureStyle(line_color=rgb_to_kml("#8E44AD"), line_width=1.5,
-                                           icon_href=ICON_WORSHIP, icon_scale=1.1),
-    ("amenity", "finance"):   FeatureStyle(line_color=rgb_to_kml("#2C3E50"), line_width=1.5,
-                                           icon_href=ICON_SQUARE, icon_scale=1.0),
-    ("amenity", "*"):         FeatureStyle(line_color=rgb_to_kml("#E67E22"), line_width=1.5,
-                                           icon_href=ICON_CIRCLE, icon_scale=0.9),
+    ("amenity",   "food",           "#E67E22", 1.5, None,      None, ICON_DINING,       1.1),
+    ("amenity",   "education",      "#27AE60", 1.5, None,      None, ICON_SCHOOLS,      1.1),
+    ("amenity",   "health",         "#E74C3C", 1.5, None,      None, ICON_HOSPITAL,     1.1),
+    ("amenity",   "transport",      "#3498DB", 1.5, None,      None, ICON_PARKING,      1.0),
+    ("amenity",   "emergency",      "#2980B9", 1.5, None,      None, ICON_POLICE,       1.1),
+    ("amenity",   "worship",        "#8E44AD", 1.5, None,      None, ICON_WORSHIP,      1.1),
+    ("amenity",   "finance",        "#2C3E50", 1.5, None,      None, ICON_SQUARE,       1.0),
+    ("amenity",   "*",              "#E67E22", 1.5, None,      None, ICON_CIRCLE,       0.9),
 
     # ---- Tourism ----
-    ("tourism", "accommodation"): FeatureStyle(line_color=rgb_to_kml("#F1C40F"), line_width=1.5,
-                                               icon_href=ICON_HOTEL, icon_scale=1.1),
-    ("tourism", "culture"):       FeatureStyle(line_color=rgb_to_kml("#E91E8C"), line_width=1.5,
-                                               icon_href=ICON_MUSEUM, icon_scale=1.1),
-    ("tourism", "viewpoint"):     FeatureStyle(line_color=rgb_to_kml("#3498DB"), line_width=1.5,
-                                               icon_href=ICON_VIEWPOINT, icon_scale=1.1),
-    ("tourism", "camping"):       FeatureStyle(line_color=rgb_to_kml("#27AE60"), line_width=1.5,
-                                               icon_href=ICON_CAMPING, icon_scale=1.1),
-    ("tourism", "*"):             FeatureStyle(line_color=rgb_to_kml("#F1C40F"), line_width=1.5,
-                                               icon_href=ICON_STAR, icon_scale=1.0),
+    ("tourism",   "accommodation",  "#F1C40F", 1.5, None,      None, ICON_HOTEL,        1.1),
+    ("tourism",   "culture",        "#E91E8C", 1.5, None,      None, ICON_MUSEUM,       1.1),
+    ("tourism",   "viewpoint",      "#3498DB", 1.5, None,      None, ICON_VIEWPOINT,    1.1),
+    ("tourism",   "camping",        "#27AE60", 1.5, None,      None, ICON_CAMPING,      1.1),
+    ("tourism",   "*",              "#F1C40F", 1.5, None,      None, ICON_STAR,         1.0),
 
     # ---- Shops ----
-    ("shop", "*"): FeatureStyle(line_color=rgb_to_kml("#AF7AC5"), line_width=1.5,
-                                icon_href=ICON_SHOP, icon_scale=1.0),
+    ("shop",      "*",              "#AF7AC5", 1.5, None,      None, ICON_SHOP,         1.0),
 
     # ---- Utilities ----
-    ("utility", "power_line"):     FeatureStyle(line_color=rgb_to_kml("#7F8C8D"), line_width=1.5),
-    ("utility", "power_tower"):    FeatureStyle(line_color=rgb_to_kml("#7F8C8D"), line_width=1.0,
-                                                icon_href=ICON_TRIANGLE, icon_scale=0.8),
-    ("utility", "power_facility"): FeatureStyle(line_color=rgb_to_kml("#F39C12"), line_width=2.0,
-                                                poly_color=rgb_to_kml("#F9E79F", "60")),
-    ("utility", "*"):              FeatureStyle(line_color=rgb_to_kml("#7F8C8D"), line_width=1.5),
+    ("utility",   "power_line",     "#7F8C8D", 1.5, None,      None, None,              1.0),
+    ("utility",   "power_tower",    "#7F8C8D", 1.0, None,      None, ICON_TRIANGLE,     0.8),
+    ("utility",   "power_facility", "#F39C12", 2.0, "#F9E79F", 0x60, None,              1.0),
+    ("utility",   "*",              "#7F8C8D", 1.5, None,      None, None,              1.0),
 
     # ---- Barriers ----
-    ("barrier", "linear"): FeatureStyle(line_color=rgb_to_kml("#616A6B"), line_width=1.5),
-    ("barrier", "access"): FeatureStyle(line_color=rgb_to_kml("#E74C3C"), line_width=1.0,
-                                        icon_href=ICON_SQUARE, icon_scale=0.7),
-    ("barrier", "*"):      FeatureStyle(line_color=rgb_to_kml("#616A6B"), line_width=1.0),
+    ("barrier",   "linear",         "#616A6B", 1.5, None,      None, None,              1.0),
+    ("barrier",   "access",         "#E74C3C", 1.0, None,      None, ICON_SQUARE,       0.7),
+    ("barrier",   "*",              "#616A6B", 1.0, None,      None, None,              1.0),
 
     # ---- Aeroway ----
-    ("aeroway", "runway"):   FeatureStyle(line_color=rgb_to_kml("#2C3E50"), line_width=5.0,
-                                          poly_color=rgb_to_kml("#566573", "80")),
-    ("aeroway", "terminal"): FeatureStyle(line_color=rgb_to_kml("#2C3E50"), line_width=2.0,
-                                          poly_color=rgb_to_kml("#ABB2B9", "80")),
-    ("aeroway", "*"):        FeatureStyle(line_color=rgb_to_kml("#566573"), line_width=2.0),
+    ("aeroway",   "runway",         "#2C3E50", 5.0, "#566573", 0x80, None,              1.0),
+    ("aeroway",   "terminal",       "#2C3E50", 2.0, "#ABB2B9", 0x80, None,              1.0),
+    ("aeroway",   "*",              "#566573", 2.0, None,      None, None,              1.0),
 
     # ---- Natural ----
-    ("natural", "peak"):  FeatureStyle(line_color=rgb_to_kml("#784212"), line_width=1.0,
-                                       icon_href=ICON_PEAK, icon_scale=1.2),
-    ("natural", "cliff"): FeatureStyle(line_color=rgb_to_kml("#784212"), line_width=2.5),
-    ("natural", "beach"): FeatureStyle(line_color=rgb_to_kml("#F9E79F"), line_width=1.5,
-                                       poly_color=rgb_to_kml("#FCF3CF", "70")),
-    ("natural", "tree"):  FeatureStyle(line_color=rgb_to_kml("#196F3D"), line_width=1.0,
-                                       icon_href=ICON_TREE, icon_scale=0.8),
-    ("natural", "*"):     FeatureStyle(line_color=rgb_to_kml("#7D6608"), line_width=1.5),
+    ("natural",   "peak",           "#784212", 1.0, None,      None, ICON_PEAK,         1.2),
+    ("natural",   "cliff",          "#784212", 2.5, None,      None, None,              1.0),
+    ("natural",   "beach",          "#F9E79F", 1.5, "#FCF3CF", 0x70, None,              1.0),
+    ("natural",   "tree",           "#196F3D", 1.0, None,      None, ICON_TREE,         0.8),
+    ("natural",   "*",              "#7D6608", 1.5, None,      None, None,              1.0),
 
     # ---- Boundaries ----
-    ("boundary", "administrative"): FeatureStyle(line_color=rgb_to_kml("#8E44AD"), line_width=3.0),
-    ("boundary", "*"):              FeatureStyle(line_color=rgb_to_kml("#8E44AD"), line_width=2.0),
+    ("boundary",  "administrative", "#8E44AD", 3.0, None,      None, None,              1.0),
+    ("boundary",  "*",              "#8E44AD", 2.0, None,      None, None,              1.0),
 
     # ---- Public transport ----
-    ("transport", "stop"): FeatureStyle(line_color=rgb_to_kml("#2980B9"), line_width=1.5,
-                                        icon_href=ICON_BUS, icon_scale=1.0),
-    ("transport", "*"):    FeatureStyle(line_color=rgb_to_kml("#2980B9"), line_width=1.5,
-                                        icon_href=ICON_BUS, icon_scale=0.9),
+    ("transport", "stop",           "#2980B9", 1.5, None,      None, ICON_BUS,          1.0),
+    ("transport", "*",              "#2980B9", 1.5, None,      None, ICON_BUS,          0.9),
 
     # ---- Fallback ----
-    ("other", "*"): FeatureStyle(line_color=rgb_to_kml("#BDC3C7"), line_width=1.5,
-                                 icon_href=ICON_DEFAULT, icon_scale=0.8),
-}
+    ("other",     "*",              "#BDC3C7", 1.5, None,      None, ICON_DEFAULT,      0.8),
+]
+
+# Read-only: lookups go through _RESOLVED, which is seeded from this table
+_STYLES: Mapping[tuple[str, str], FeatureStyle] = MappingProxyType({
+    (category, subcategory): FeatureStyle(
+        line_color=rgb_to_kml(line_rgb),
+        line_width=line_width,
+        poly_color=rgb_to_kml(fill_rgb, fill_alpha) if fill_rgb else 0,
+        icon_index=_ICON_IDX[icon] if icon else 0,
+        icon_scale=icon_scale,
+    )
+    for category, subcategory, line_rgb, line_width, fill_rgb, fill_alpha, icon, icon_scale in _PALETTE
+})
+
+
+def _resolve_style(category: str, subcategory: str) -> FeatureStyle:
+    style = _STYLES.get((category, subcategory))
+    if style is not None:
+        return style
+    style = _STYLES.get((category, "*"))
+    if style is not None:
+        return style
+    return _STYLES[("other", "*")]
+
+
+class _Memo(dict):
+    """Dict keyed by ``(category, subcategory)`` that fills in missing keys.
+
+    A miss calls ``compute(category, subcategory)`` once and stores the result,
+    so every later lookup of that key is a single dict hit.
+    """
+
+    def __init__(self, compute: Callable[[str, str], Any]) -> None:
+        super().__init__()
+        self._compute = compute
+
+    def __missing__(self, key: tuple[str, str]) -> Any:
+        value = self[key] = self._compute(*key)
+        return value
+
 
+# (category, subcategory) -> style with the fallback chain already applied
+_RESOLVED: _Memo = _Memo(_resolve_style)
+_RESOLVED.update(_STYLES)
 
-def get_style(category: str, subcategory: str) -> FeatureStyle:
+
+def get_style(category: str, subcategory: str, _resolved: _Memo = _RESOLVED) -> FeatureStyle:
     """Look up the visual style for a classification.
 
     Resolution order:
         1. Exact match  (category, subcategory)
         2. Wildcard      (category, "*")
         3. Default        ("other", "*")
+
+    ``_resolved`` binds the lookup table as a fast local; don't pass it.
     """
-    style = _STYLES.get((category, subcategory))
-    if style is not None:
-        return style
-    style = _STYLES.get((category, "*"))
-    if style is not None:
-        return style
-    return _STYLES[("other", "*")]
+    return _resolved[(category, subcategory)]
+
 
+def get_styles(pairs: Iterable[tuple[str, str]]) -> list[FeatureStyle]:
+    """Look up styles for many ``(category, subcategory)`` pairs at once.
 
-def style_id(category: str, subcategory: str) -> str:
-    """Return a stable style ID string suitable for a KML ``<Style id="...">``."""
-    return f"style-{category}-{subcategory}"
+    Same resolution as :func:`get_style`, without a function call per pair.
+    """
+    resolved = _RESOLVED
+    return [resolved[pair] for pair in pairs]
+
+
+def _make_style_id(category: str, subcategory: str) -> str:
+    return sys.intern(f"style-{category}-{subcategory}")
+
+
+# (category, subcategory) -> interned style id, precomputed for the palette
+_STYLE_IDS: _Memo = _Memo(_make_style_id)
+_STYLE_IDS.update({key: _make_style_id(*key) for key in _STYLES})
+
+
+def style_id(category: str, subcategory: str, _ids: _Memo = _STYLE_IDS) -> str:
+    """Return a stable style ID string suitable for a KML ``<Style id="...">``.
+
+    ``_ids`` binds the lookup table as a fast local; don't pass it.
+    """
+    return _ids[(category, subcategory)]
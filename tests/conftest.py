@@ -0,0 +1,21 @@
+"""Shared pytest fixtures.
+
+Session-scoped fixtures are built once per pytest process (once per worker
+when running under pytest-xdist) and the same objects are handed to every
+test that requests them, so tests must treat them as read-only.  Tests that
+need to modify parsed data should parse their own copy.
+"""
+
+from pathlib import Path
+
+import pytest
+
+from opt_refactor.parser import Feature, parse_kml_file
+
+SAMPLE_DIR = Path(__file__).parent / "sample_data"
+
+
+@pytest.fixture(scope="session")
+def sample_features() -> list[Feature]:
+    """Features parsed once from ``overpass_sample.kml``; treat as read-only."""
+    return parse_kml_file(str(SAMPLE_DIR / "overpass_sample.kml"))
@@ -1,17 +1,22 @@
 """Tests for the feature classifier."""
 
-from opt_refactor.classifier import classify, Classification
+from dataclasses import astuple
+
+from opt_refactor.classifier import CATEGORIES, SUBCATEGORY_LABELS, classify, Classification
 from opt_refactor.parser import Feature
 from lxml import etree
 
 
+# Classification never looks at (or mutates) the geometry, so share one
+_DUMMY_GEOM = etree.Element("Point")
+
+
 def _make_feature(tags: dict[str, str], geom_type: str = "Point") -> Feature:
     """Helper to create a minimal Feature with given tags."""
-    geom = etree.Element("Point")
     return Feature(
         name="test",
         geometry_type=geom_type,
-        geometry_element=geom,
+        geometry_element=_DUMMY_GEOM,
         tags=tags,
     )
 
@@ -119,3 +124,35 @@ def test_classify_boundary():
     c = classify(f)
     assert c.category == "boundary"
     assert c.subcategory == "administrative"
+
+
+def test_first_match_wins_across_keys():
+    # landuse=residential is listed before the natural catch-alls, so it must
+    # win even though the natural key appears earlier in the rule table
+    f = _make_feature({"natural": "peak", "landuse": "residential"}, "Polygon")
+    c = classify(f)
+    assert c == Classification("landuse", "residential")
+
+
+def test_same_relevant_tags_share_result():
+    # Tags the rules never look at (name, lanes) don't affect the result
+    a = classify(_make_feature({"highway": "residential", "name": "Elm Avenue"}))
+    b = classify(_make_feature({"highway": "residential", "lanes": "2"}))
+    assert a is b
+
+
+def test_categories_cover_classification_results():
+    c = classify(_make_feature({"waterway": "river"}, "LineString"))
+    assert c.category in CATEGORIES
+    assert "other" in CATEGORIES
+    assert list(CATEGORIES) == sorted(CATEGORIES)
+
+
+def test_classification_has_only_category_and_subcategory():
+    c = classify(_make_feature({"waterway": "river"}, "LineString"))
+    assert astuple(c) == ("water", "river")
+
+
+def test_subcategory_labels():
+    assert SUBCATEGORY_LABELS["power_line"] == "Power Line"
+    assert SUBCATEGORY_LABELS["unknown"] == "Unknown"
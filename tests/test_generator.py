@@ -2,8 +2,18 @@
 
 from pathlib import Path
 
-from opt_refactor.generator import generate_styled_kml, _sanitise_text
-from opt_refactor.parser import parse_kml_file
+import pytest
+from lxml import etree
+
+from opt_refactor.generator import (
+    _OVERPASS_PATTERNS,
+    _build_description,
+    _sanitise_text,
+    generate_styled_kml,
+    generate_styled_kml_bytes,
+    generate_styled_kml_file,
+)
+from opt_refactor.parser import KML_NS, Feature, parse_kml_file
 
 SAMPLE_DIR = Path(__file__).parent / "sample_data"
 
@@ -19,6 +29,13 @@ def test_generate_produces_valid_kml():
     assert 'kml' in kml_str
 
 
+def test_generate_bytes_matches_string():
+    features = _load_sample_features()
+    kml_bytes = generate_styled_kml_bytes(features)
+    assert kml_bytes.startswith(b"<?xml")
+    assert kml_bytes.decode("utf-8") == generate_styled_kml(features)
+
+
 def test_atoc_branding_present():
     features = _load_sample_features()
     kml_str = generate_styled_kml(features)
@@ -59,6 +76,13 @@ def test_sanitise_text():
     assert _sanitise_text("Generated by overpass-api data") == "data"
 
 
+def test_sanitise_text_prefilter_matches_regex():
+    """The literal prefilter must not skip text the case-insensitive regex matches."""
+    for text in ("OVERPASS Turbo", "to\u212aml", "My Map", " OSMtoGeoJSON data "):
+        assert _sanitise_text(text) == _OVERPASS_PATTERNS.sub("", text).strip()
+    assert _sanitise_text("OVERPASS Turbo") == ""
+
+
 def test_point_features_get_icons():
     features = _load_sample_features()
     kml_str = generate_styled_kml(features)
@@ -92,6 +116,7 @@ def test_description_contains_tags():
     # The pizza restaurant should have cuisine=pizza in its description
     assert "cuisine" in kml_str
     assert "pizza" in kml_str
+    assert "<description><![CDATA[<table>" in kml_str
 
 
 def test_internal_tags_excluded_from_description():
@@ -99,3 +124,59 @@ def test_internal_tags_excluded_from_description():
     features = _load_sample_features()
     kml_str = generate_styled_kml(features)
     assert "@id" not in kml_str
+
+
+def test_features_reusable_across_runs():
+    """Generating must not consume the parsed geometry."""
+    features = _load_sample_features()
+    first = generate_styled_kml(features)
+    second = generate_styled_kml(features)
+    assert first == second
+    assert "-73.9857,40.7484" in second
+
+
+def _element_outline(root):
+    return [(el.tag, el.attrib, (el.text or "").strip()) for el in root.iter()]
+
+
+def test_file_output_matches_string_output(tmp_path):
+    """The streamed file holds the same document as the in-memory string."""
+    features = _load_sample_features()
+    out = tmp_path / "out.kml"
+    generate_styled_kml_file(features, str(out))
+    written = etree.parse(str(out)).getroot()
+    expected = etree.fromstring(generate_styled_kml(features).encode("utf-8"))
+    assert _element_outline(written) == _element_outline(expected)
+    # Namespace-equivalent: the re-declared xmlns on streamed elements must
+    # still put every element in the KML namespace, with no stray prefixes
+    assert written.nsmap == expected.nsmap == {None: KML_NS}
+    for el in written.iter(etree.Element):
+        assert etree.QName(el).namespace == KML_NS
+        assert el.prefix is None
+
+
+def test_failed_file_output_keeps_existing_file(tmp_path):
+    """A generation error must not truncate or replace an existing output."""
+    out = tmp_path / "out.kml"
+    out.write_text("previous export")
+    bad = Feature(
+        name="Bad\x01Name",
+        geometry_type="Point",
+        geometry_element=etree.Element("Point"),
+        tags={"amenity": "cafe"},
+    )
+    with pytest.raises(ValueError):
+        generate_styled_kml_file(_load_sample_features() + [bad], str(out))
+    assert out.read_text() == "previous export"
+    assert [p.name for p in tmp_path.iterdir()] == ["out.kml"]
+
+def test_description_escapes_tag_values():
+    """Markup in tag values must not break the description table."""
+    feature = Feature(
+        name="Cafe",
+        geometry_type="Point",
+        geometry_element=etree.Element("Point"),
+        tags={"@id": "node/1", "name": "Fish & <Chips>", "source": "survey"},
+    )
+    desc = _build_description(feature)
+    assert desc == "<table><tr><td><b>name</b></td><td>Fish &amp; &lt;Chips&gt;</td></tr></table>"
@@ -1,36 +1,28 @@
 """Tests for the KML parser."""
 
-from pathlib import Path
+from opt_refactor.parser import parse_kml
 
-from opt_refactor.parser import parse_kml, parse_kml_file
 
-SAMPLE_DIR = Path(__file__).parent / "sample_data"
+def test_parse_sample_kml_file(sample_features):
+    assert len(sample_features) == 10
 
 
-def test_parse_sample_kml_file():
-    features = parse_kml_file(str(SAMPLE_DIR / "overpass_sample.kml"))
-    assert len(features) == 10
-
-
-def test_feature_geometry_types():
-    features = parse_kml_file(str(SAMPLE_DIR / "overpass_sample.kml"))
-    types = {f.name: f.geometry_type for f in features}
+def test_feature_geometry_types(sample_features):
+    types = {f.name: f.geometry_type for f in sample_features}
     assert types["Main Street"] == "LineString"
     assert types["City Library"] == "Polygon"
     assert types["Joe's Pizza"] == "Point"
     assert types["Riverside Park"] == "Polygon"
 
 
-def test_feature_tags_extracted():
-    features = parse_kml_file(str(SAMPLE_DIR / "overpass_sample.kml"))
-    pizza = next(f for f in features if f.name == "Joe's Pizza")
+def test_feature_tags_extracted(sample_features):
+    pizza = next(f for f in sample_features if f.name == "Joe's Pizza")
     assert pizza.tags["amenity"] == "restaurant"
     assert pizza.tags["cuisine"] == "pizza"
 
 
-def test_osm_id_extracted():
-    features = parse_kml_file(str(SAMPLE_DIR / "overpass_sample.kml"))
-    main_st = next(f for f in features if f.name == "Main Street")
+def test_osm_id_extracted(sample_features):
+    main_st = next(f for f in sample_features if f.name == "Main Street")
     assert main_st.osm_id == "way/12345"
 
 
@@ -64,3 +56,24 @@ def test_placemark_without_geometry_skipped():
     </kml>"""
     features = parse_kml(kml)
     assert len(features) == 0
+
+
+def test_parse_placemarks_in_folders():
+    kml = """<?xml version="1.0" encoding="UTF-8"?>
+    <kml xmlns="http://www.opengis.net/kml/2.2">
+      <Document>
+        <Folder>
+          <name>First</name>
+          <Placemark><name>A</name><Point><coordinates>1,1,0</coordinates></Point></Placemark>
+          <Placemark><name>B</name><Point><coordinates>2,2,0</coordinates></Point></Placemark>
+        </Folder>
+        <Folder>
+          <Placemark><name>C</name><LineString><coordinates>3,3,0 4,4,0</coordinates></LineString></Placemark>
+        </Folder>
+      </Document>
+    </kml>"""
+    features = parse_kml(kml)
+    assert [f.name for f in features] == ["A", "B", "C"]
+    # Geometry is detached from the (discarded) source placemark
+    assert all(f.geometry_element.getparent() is None for f in features)
+    assert features[2].geometry_element[0].text == "3,3,0 4,4,0"
@@ -0,0 +1,68 @@
+"""Tests for the style palette."""
+
+import pytest
+
+from opt_refactor.styles import (
+    ICON_DINING,
+    _RESOLVED,
+    _STYLES,
+    get_style,
+    get_styles,
+    kml_hex,
+    rgb_to_kml,
+    style_id,
+)
+
+
+def test_rgb_to_kml_reorders_channels():
+    assert rgb_to_kml("#E74C3C") == 0xff3c4ce7
+    assert rgb_to_kml("123456") == 0xff563412
+
+
+def test_rgb_to_kml_alpha():
+    assert rgb_to_kml("#3498DB", 0x80) == 0x80db9834
+
+
+def test_rgb_to_kml_rejects_bad_input():
+    for bad in (
+        "#FFF", "#1234567", "", "-12345", "+12345", " 12345", "12345 ",
+        "12_345", "0x1234", "#0x1234", "#GGGGGG",
+    ):
+        with pytest.raises(ValueError):
+            rgb_to_kml(bad)
+    with pytest.raises(ValueError):
+        rgb_to_kml("#E74C3C", 0x180)
+    with pytest.raises(ValueError):
+        rgb_to_kml("#E74C3C", -1)
+
+
+def test_kml_hex():
+    assert kml_hex(rgb_to_kml("#E74C3C")) == "ff3c4ce7"
+    assert kml_hex(0x0000ff) == "000000ff"
+
+
+def test_get_style_fallbacks():
+    assert get_style("road", "motorway") is _STYLES[("road", "motorway")]
+    # Unknown subcategory -> category wildcard
+    assert get_style("building", "general") is _STYLES[("building", "*")]
+    # Unknown category -> global default
+    assert get_style("nonsense", "thing") is _STYLES[("other", "*")]
+    # The fallback is memoised under the requested pair
+    assert ("nonsense", "thing") in _RESOLVED
+
+
+def test_style_id():
+    assert style_id("road", "motorway") == "style-road-motorway"
+    assert style_id("building", "general") == "style-building-general"
+    assert style_id("building", "general") is style_id("building", "general")
+
+
+def test_icon_href_resolves_index():
+    assert get_style("amenity", "food").icon_href == ICON_DINING
+    assert get_style("road", "motorway").icon_index == 0
+    assert get_style("road", "motorway").icon_href == ""
+
+
+def test_get_styles_matches_get_style():
+    pairs = [("road", "motorway"), ("building", "general"), ("nonsense", "thing")]
+    assert get_styles(pairs) == [get_style(c, s) for c, s in pairs]